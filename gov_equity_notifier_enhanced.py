@@ -11,92 +11,84 @@ Exit codes:
   3 = email failure
 """
 
-import os, re, sqlite3, sys, smtplib, textwrap
+import os, re, gzip, hashlib, heapq, json, sqlite3, sys, smtplib, textwrap, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from html import unescape
 from datetime import datetime
 from urllib.parse import urljoin
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
+import lxml.etree
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from gov_patterns import (
+    GOVERNMENT_ENTITIES, INVESTMENT_TERMS, GOV_RE, INV_RE, TXN_RE, FP_RE,
+    PREFILTER_KEYWORDS, PREFILTER_ACRONYM_RE,
+)
 
 # -------------------
-# Enhanced filtering patterns
+# Scoring patterns (filtering patterns live in gov_patterns.py)
 # -------------------
 
-# Government entities - more specific patterns
-GOVERNMENT_ENTITIES = [
-    r"\bU\.S\. Government\b",
-    r"\bUnited States Government\b",
-    r"\bDepartment of Commerce\b",
-    r"\bDepartment of Defense\b",
-    r"\bDOD\b",
-    r"\bDOC\b",
-    r"\bTreasury Department\b",
-    r"\bU\.S\. Treasury\b",
-    r"\bNational Security\b",
-    r"\bCHIPS and Science Act\b",
-    r"\bCHIPS Act\b",
-    r"\bDefense Production Act\b",
-    r"\bCommittee on Foreign Investment\b",
-    r"\bCFIUS\b"
-]
-
-# Investment/transaction terms - more precise
-INVESTMENT_TERMS = [
-    r"\bequity investment\b",
-    r"\bequity stake\b",
-    r"\bequity position\b",
-    r"\bpreferred shares\b",
-    r"\bpreferred stock investment\b",
-    r"\bstock purchase\b",
-    r"\bwarrant agreement\b",
-    r"\bwarrant issuance\b",
-    r"\bconvertible preferred\b",
-    r"\bseries [A-Z] preferred\b",
-    r"\binvestment agreement\b",
-    r"\bpurchase agreement\b",
-    r"\bfunding agreement\b",
-    r"\bcapital investment\b"
-]
-
-# Transaction indicators - signals of actual deals
-TRANSACTION_INDICATORS = [
-    r"\$[\d,]+\s*(million|billion)\s*(investment|funding|purchase)",
-    r"(received|obtained|secured)\s+\$[\d,]+",
-    r"(closing|completion)\s+of.*investment",
-    r"(entered into|executed|signed).*agreement",
-    r"(purchase|issuance)\s+of.*shares",
-    r"(funding|investment).*of\s+\$[\d,]+",
-    r"(total|aggregate)\s+(funding|investment)",
-    r"(first|initial|additional)\s+tranche"
-]
-
-# Common false positive contexts to exclude
-FALSE_POSITIVE_EXCLUSIONS = [
-    r"risk.*factors?",
-    r"material.*weakness",
-    r"legal.*proceedings?",
-    r"forward.*looking.*statements?",
-    r"hypothetical",
-    r"example",
-    r"illustration",
-    r"may.*be.*subject.*to",
-    r"could.*be.*impacted.*by",
-    r"potential.*future",
-    r"general.*economic.*conditions",
-    r"regulatory.*environment",
-    r"bond.*market",
-    r"debt.*securities",
-    r"credit.*facility"
-]
+# 8-K items that typically contain material agreements
+ITEM_RE = re.compile(r"item\s+(1\.01|3\.02)")
+
+# Anchors on a filing index page, matched on raw HTML so the page is never parsed.
+# The href may be double-quoted, single-quoted or unquoted; group 4 is the link body.
+ANCHOR_RE = re.compile(
+    r"""<a\b[^>]*?\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))[^>]*>(.*?)</a>""",
+    re.I | re.S,
+)
+TAG_RE = re.compile(r"<[^>]*>")
+# Link text of the primary document
+DOC_NAME_RE = re.compile(r"\.htm(l)?$", re.I)
 
 SNIPPET_CHARS = 120  # Tighter context window
 PROXIMITY_CHARS = 150  # Stricter proximity requirement
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "gov_equity_seen.sqlite3")
+IDX_CACHE_PATH = os.path.join(os.path.dirname(DB_PATH), ".latest_idx.json")
+CACHE_DIR = os.path.join(os.path.dirname(DB_PATH), ".cache")
+CACHE_TTL_SECONDS = 24 * 60 * 60  # Re-runs within a day reuse downloaded filings
+
+ARCHIVES_BASE = "https://www.sec.gov/Archives/"
+MAX_WORKERS = 8  # Concurrent filing fetches
+SEC_MAX_RPS = 8  # SEC fair-access limit is 10 requests/second per User-Agent
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+SEC_LIMITER = RateLimiter(SEC_MAX_RPS)
+
+# One keep-alive session for every SEC request; User-Agent is set in main().
+# One pooled connection per worker plus the streaming master index; pool_block
+# makes extra threads wait for a warm connection instead of opening throwaway ones.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=MAX_WORKERS + 1,
+    pool_block=True,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
 
 # ---------------
 # Enhanced analysis functions
@@ -111,6 +103,10 @@ def must_get_env(name: str) -> str:
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
+    # Advisory cache: WAL + NORMAL sync trades a little durability for far fewer fsyncs
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS seen (
           cik TEXT NOT NULL,
@@ -119,33 +115,114 @@ def init_db():
           PRIMARY KEY (cik, accession)
         )
     """)
+    # Serves monitor_notifier's high-confidence count without a full table scan
+    conn.execute("CREATE INDEX IF NOT EXISTS seen_hi_conf ON seen(confidence) WHERE confidence >= 0.7")
     conn.commit()
     return conn
 
-def seen_before(conn, cik, accession) -> bool:
-    cur = conn.execute("SELECT 1 FROM seen WHERE cik=? AND accession=?", (cik, accession))
-    return cur.fetchone() is not None
+def load_seen(conn) -> set:
+    """All (cik, accession) pairs already recorded, for O(1) in-memory dedup."""
+    return {(cik, accession) for cik, accession in conn.execute("SELECT cik, accession FROM seen")}
 
 def mark_seen(conn, cik, accession, confidence=0.0):
     conn.execute("INSERT OR IGNORE INTO seen (cik, accession, confidence) VALUES (?, ?, ?)",
                 (cik, accession, confidence))
-    conn.commit()
 
-def get_json(url, headers):
-    r = requests.get(url, headers=headers, timeout=30)
+def get_json(url):
+    SEC_LIMITER.wait()
+    r = SESSION.get(url, timeout=30)
     r.raise_for_status()
     return r.json()
 
-def get_text(url, headers):
-    r = requests.get(url, headers=headers, timeout=60)
+def get_text(url):
+    """GET a page as text, served from the on-disk cache when fetched in the last day."""
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    path = os.path.join(CACHE_DIR, key[:2], f"{key}.gz")
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_TTL_SECONDS:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.read()
+    except (OSError, EOFError):
+        pass
+
+    SEC_LIMITER.wait()
+    r = SESSION.get(url, timeout=60)
     r.raise_for_status()
-    return r.text
+    text = r.text
 
-def latest_master_idx_url(headers):
+    # Write to a temp file and rename so concurrent readers never see a partial entry
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return text
+
+def prune_cache():
+    """Delete cached pages (and stray temp files) older than CACHE_TTL_SECONDS."""
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    for dirpath, _, filenames in os.walk(CACHE_DIR):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+def stream_lines(url):
+    """Iterate the lines of a text resource as they download.
+
+    The request is sent eagerly so HTTP errors raise here rather than on first
+    iteration; a connection dropped mid-download still raises while iterating.
+    """
+    SEC_LIMITER.wait()
+    r = SESSION.get(url, stream=True, timeout=60)
+    try:
+        r.raise_for_status()
+    except requests.HTTPError:
+        # An unread streamed body pins its connection; release it to the blocking pool
+        r.close()
+        raise
+    # iter_lines yields bytes when no charset is known; master indexes are plain ASCII
+    r.encoding = r.encoding or "latin-1"
+    return r.iter_lines(decode_unicode=True)
+
+def parse_html(html):
+    """Parse HTML with lxml, ignoring any XML encoding declaration (common in iXBRL 8-Ks)."""
+    # huge_tree: without it libxml2 silently drops text nodes over ~10 MB
+    parser = lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+    return lxml.html.fromstring(html.encode("utf-8"), parser=parser)
+
+def index_url_exists(url) -> bool:
+    try:
+        SEC_LIMITER.wait()
+        return SESSION.head(url, timeout=10).status_code == 200
+    except requests.RequestException:
+        return False
+
+def latest_master_idx_url():
     """Get the most recent master index file from SEC EDGAR."""
     from datetime import datetime, timedelta
 
-    # Try recent business days
+    # Reuse today's answer if it is still reachable
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        with open(IDX_CACHE_PATH) as f:
+            cached = json.load(f)
+        if cached.get("date") == today and index_url_exists(cached["url"]):
+            return cached["url"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Try recent business days, newest first
+    candidates = []
     for days_back in range(1, 10):
         test_date = datetime.now() - timedelta(days=days_back)
 
@@ -157,128 +234,159 @@ def latest_master_idx_url(headers):
         quarter = (test_date.month - 1) // 3 + 1
         date_str = test_date.strftime("%y%m%d")
 
-        test_url = f"https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{quarter}/master.{date_str}.idx"
+        candidates.append(f"https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{quarter}/master.{date_str}.idx")
 
-        try:
-            # Test if file exists
-            response = requests.head(test_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                return test_url
-        except:
-            continue
+    # Probe all candidates concurrently instead of one round-trip at a time
+    with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+        found = list(pool.map(index_url_exists, candidates))
+
+    for test_url, exists in zip(candidates, found):
+        if exists:
+            try:
+                with open(IDX_CACHE_PATH, "w") as f:
+                    json.dump({"date": today, "url": test_url}, f)
+            except OSError:
+                pass
+            return test_url
 
     raise RuntimeError("No accessible master index found in past 10 days")
 
-def parse_master_idx(text):
+def parse_master_idx(lines):
     """Yields dicts with company, cik, form, date, path, accession."""
-    for line in text.splitlines():
-        if "|8-K|" in line:
-            parts = line.split("|")
-            if len(parts) >= 5:
-                cik, company, form, date, path = parts[0:5]
-                try:
-                    accession = path.strip().split("/")[3]
-                except Exception:
-                    accession = ""
-                yield {
-                    "company": company.strip(),
-                    "cik": cik.strip(),
-                    "form": form.strip(),
-                    "date": date.strip(),
-                    "path": path.strip(),
-                    "accession": accession,
-                }
-
-def calculate_confidence_score(html_text: str, matches: List[Tuple]) -> float:
-    """Calculate confidence score based on various signals."""
+    for line in lines:
+        # Data rows start with a CIK; skip the header block and blank lines cheaply
+        if not line or not line[0].isdigit():
+            continue
+        if "|8-K|" not in line:
+            continue
+        parts = line.split("|", 5)
+        if len(parts) >= 5:
+            cik, company, form, date, path = parts[0:5]
+            try:
+                accession = path.strip().split("/")[3]
+            except Exception:
+                accession = ""
+            yield {
+                "company": company.strip(),
+                "cik": cik.strip(),
+                "form": form.strip(),
+                "date": date.strip(),
+                "path": path.strip(),
+                "accession": accession,
+            }
+
+def calculate_confidence_score(text_lower: str, matches: List[Tuple]) -> float:
+    """Calculate confidence score based on various signals.
+
+    text_lower is the filing's already-lowercased text; matches are
+    (label, snippet, position) tuples from scan_filing_for_hits.
+    """
     score = 0.0
-    text_lower = html_text.lower()
 
     # Base score for any match
     score += 0.3
 
     # Bonus for multiple government entity mentions
-    gov_mentions = sum(1 for pattern in GOVERNMENT_ENTITIES
-                      if re.search(pattern, html_text, re.I))
+    gov_mentions = sum(1 for rx in GOV_RE if rx.search(text_lower))
     score += min(gov_mentions * 0.1, 0.3)
 
     # High bonus for transaction indicators with dollar amounts
-    transaction_matches = sum(1 for pattern in TRANSACTION_INDICATORS
-                            if re.search(pattern, html_text, re.I))
+    transaction_matches = sum(1 for rx in TXN_RE if rx.search(text_lower))
     score += transaction_matches * 0.4
 
     # Bonus for specific 8-K items that typically contain material agreements
-    if re.search(r"item\s+(1\.01|3\.02)", text_lower):
+    if ITEM_RE.search(text_lower):
         score += 0.2
 
     # Penalty for false positive contexts
-    fp_matches = sum(1 for pattern in FALSE_POSITIVE_EXCLUSIONS
-                    if re.search(pattern, html_text, re.I))
+    fp_matches = sum(1 for rx in FP_RE if rx.search(text_lower))
     score -= fp_matches * 0.15
 
     # Bonus for being in first half of document (material info usually comes first)
     if len(matches) > 0:
-        avg_position = sum(html_text.find(match[1]) for match in matches) / len(matches)
-        if avg_position < len(html_text) * 0.5:
+        avg_position = sum(match[2] for match in matches) / len(matches)
+        if avg_position < len(text_lower) * 0.5:
             score += 0.1
 
     return max(0.0, min(1.0, score))
 
-def scan_filing_for_hits(url, headers) -> Tuple[List[Tuple], float]:
+def ordered_matches(patterns, compiled, text) -> List[Tuple]:
+    """(pattern, match) for every match of every pattern, merged into document order."""
+    per_pattern = [[(pattern, m) for m in rx.finditer(text)]
+                   for pattern, rx in zip(patterns, compiled)]
+    return list(heapq.merge(*per_pattern, key=lambda t: t[1].start()))
+
+def scan_filing_for_hits(url) -> Tuple[List[Tuple], float]:
     """Enhanced scanning with confidence scoring."""
-    html = get_text(url, headers)
+    html = get_text(url)
 
     # Clean up HTML for better text analysis
-    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        tree = parse_html(html)
+    except lxml.etree.ParserError:
+        return [], 0.0  # No elements at all (empty, comment-only, bare XML declaration)
     # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.decompose()
-    clean_text = soup.get_text()
+    for script in tree.xpath("//script|//style"):
+        script.drop_tree()
+    clean_text = tree.text_content()
+
+    # Lowercase once; all regexes run on text_lower, clean_text is kept for snippets.
+    # lower() can change length (e.g. U+0130), which would misalign match offsets
+    # with clean_text, so fall back to slicing snippets from text_lower then.
+    text_lower = clean_text.lower()
+    snippet_text = clean_text if len(clean_text) == len(text_lower) else text_lower
+
+    # Cheap substring check before any regex work; most 8-Ks never mention the government
+    if not (any(kw in text_lower for kw in PREFILTER_KEYWORDS)
+            or PREFILTER_ACRONYM_RE.search(text_lower)):
+        return [], 0.0
 
     # Find government entity mentions
-    gov_matches = []
-    for pattern in GOVERNMENT_ENTITIES:
-        for match in re.finditer(pattern, clean_text, flags=re.IGNORECASE):
-            gov_matches.append((pattern, match))
+    gov_matches = ordered_matches(GOVERNMENT_ENTITIES, GOV_RE, text_lower)
 
     if not gov_matches:
         return [], 0.0
 
     # Find investment term mentions
-    investment_matches = []
-    for pattern in INVESTMENT_TERMS:
-        for match in re.finditer(pattern, clean_text, flags=re.IGNORECASE):
-            investment_matches.append((pattern, match))
+    investment_matches = ordered_matches(INVESTMENT_TERMS, INV_RE, text_lower)
 
     if not investment_matches:
         return [], 0.0
 
-    # Check proximity between government and investment terms
+    # Check proximity between government and investment terms. Both lists are in
+    # document order, so a sliding window pairs each gov match with the earliest
+    # investment match within PROXIMITY_CHARS in O(G + I).
     valid_matches = []
+    j = 0
     for gov_pattern, gov_match in gov_matches:
-        for inv_pattern, inv_match in investment_matches:
-            distance = abs(gov_match.start() - inv_match.start())
-            if distance <= PROXIMITY_CHARS:
-                # Create context snippet
-                start = max(0, min(gov_match.start(), inv_match.start()) - SNIPPET_CHARS)
-                end = min(len(clean_text), max(gov_match.end(), inv_match.end()) + SNIPPET_CHARS)
-                snippet = re.sub(r'\s+', ' ', clean_text[start:end]).strip()
-
-                valid_matches.append((f"{gov_pattern} + {inv_pattern}", snippet))
-                break  # Avoid duplicate matches for same gov entity
+        # Investment matches too far behind this gov match are too far behind later ones too
+        while (j < len(investment_matches)
+               and investment_matches[j][1].start() < gov_match.start() - PROXIMITY_CHARS):
+            j += 1
+        if j == len(investment_matches):
+            break
+
+        inv_pattern, inv_match = investment_matches[j]
+        if inv_match.start() - gov_match.start() <= PROXIMITY_CHARS:
+            # Create context snippet
+            start = max(0, min(gov_match.start(), inv_match.start()) - SNIPPET_CHARS)
+            end = min(len(snippet_text), max(gov_match.end(), inv_match.end()) + SNIPPET_CHARS)
+            snippet = ' '.join(snippet_text[start:end].split())
+
+            position = min(gov_match.start(), inv_match.start())
+            valid_matches.append((f"{gov_pattern} + {inv_pattern}", snippet, position))
 
     if not valid_matches:
         return [], 0.0
 
-    # Check for false positive exclusions
-    for exclusion_pattern in FALSE_POSITIVE_EXCLUSIONS:
-        if re.search(exclusion_pattern, clean_text, re.I):
-            # If found in proximity to our matches, reduce confidence
-            for _, snippet in valid_matches:
-                if re.search(exclusion_pattern, snippet, re.I):
-                    return [], 0.0  # Strong false positive signal
+    # Check for false positive exclusions in proximity to our matches; only the
+    # snippets matter here, so the full document is not scanned
+    for _, snippet, _ in valid_matches:
+        snippet_lower = snippet.lower()
+        if any(rx.search(snippet_lower) for rx in FP_RE):
+            return [], 0.0  # Strong false positive signal
 
-    confidence = calculate_confidence_score(clean_text, valid_matches)
+    confidence = calculate_confidence_score(text_lower, valid_matches)
 
     # Only return matches above minimum confidence threshold
     if confidence < 0.4:
@@ -295,11 +403,68 @@ def build_email(subject, html_body, text_body, sender, recipient):
     msg.attach(MIMEText(html_body, "html"))
     return msg
 
-def send_email(msg, host, port, user, password):
-    with smtplib.SMTP(host, int(port)) as s:
-        s.starttls()
-        s.login(user, password)
-        s.send_message(msg)
+class SMTPSession:
+    """Opens one STARTTLS-authenticated SMTP connection that can send many messages."""
+
+    def __init__(self, host, port, user, password):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.smtp = None
+
+    def __enter__(self):
+        self.smtp = smtplib.SMTP(self.host, self.port)
+        try:
+            self.smtp.starttls()
+            self.smtp.login(self.user, self.password)
+        except Exception:
+            self.smtp.close()
+            raise
+        return self
+
+    def send(self, msg):
+        self.smtp.send_message(msg)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.smtp.quit()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        finally:
+            self.smtp.close()
+        return False
+
+def find_doc_href(index_html) -> Optional[str]:
+    """href of the first anchor whose link text is an .htm/.html file name, if any."""
+    for m in ANCHOR_RE.finditer(index_html):
+        link_text = unescape(TAG_RE.sub("", m.group(4)))
+        if DOC_NAME_RE.search(link_text):
+            href = next(g for g in m.group(1, 2, 3) if g is not None)
+            return unescape(href)
+    return None
+
+def process_rec(rec) -> Optional[Tuple]:
+    """Fetch and scan one 8-K; returns (rec, doc_url, hits, confidence) for a hit, else None."""
+    filing_index_url = urljoin(ARCHIVES_BASE, rec["path"])
+    try:
+        file_html = get_text(filing_index_url)
+
+        # Try to get the main 8-K document
+        doc_href = find_doc_href(file_html)
+        doc_url = filing_index_url if doc_href is None else urljoin(
+            filing_index_url.rsplit("/", 1)[0] + "/", doc_href
+        )
+
+        hits, confidence = scan_filing_for_hits(doc_url)
+
+        if hits and confidence >= 0.4:  # Only include high-confidence matches
+            return rec, doc_url, hits, confidence
+
+    except Exception as e:
+        print(f"[warn] Error scanning {filing_index_url}: {e}", file=sys.stderr)
+
+    return None
 
 def main():
     load_dotenv()
@@ -312,45 +477,42 @@ def main():
     from_email = must_get_env("FROM_EMAIL")
     to_email = must_get_env("TO_EMAIL")
 
-    headers = {"User-Agent": ua}
+    SESSION.headers["User-Agent"] = ua
     conn = init_db()
+    seen = load_seen(conn)
+    prune_cache()
 
     try:
-        idx_url = latest_master_idx_url(headers)
-        idx_text = get_text(idx_url, headers)
+        idx_url = latest_master_idx_url()
+        idx_lines = stream_lines(idx_url)
     except Exception as e:
         print(f"[error] Failed to retrieve master idx: {e}", file=sys.stderr)
         sys.exit(2)
 
-    base = "https://www.sec.gov/Archives/"
     new_hits = []
 
-    for rec in parse_master_idx(idx_text):
-        if not rec["accession"]:
-            continue
-        if seen_before(conn, rec["cik"], rec["accession"]):
-            continue
-
-        filing_index_url = urljoin(base, rec["path"])
+    # Filings are fetched and scanned on worker threads; sqlite stays on this one.
+    # All mark_seen inserts share one transaction, committed when the scan finishes.
+    with conn, ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = []
         try:
-            file_html = get_text(filing_index_url, headers)
-            soup = BeautifulSoup(file_html, "html.parser")
-
-            # Try to get the main 8-K document
-            doc_link = soup.find("a", href=True, string=re.compile(r"\.htm(l)?$", re.I))
-            doc_url = filing_index_url if not doc_link else urljoin(
-                filing_index_url.rsplit("/", 1)[0] + "/", doc_link["href"]
-            )
-
-            hits, confidence = scan_filing_for_hits(doc_url, headers)
-
-            if hits and confidence >= 0.4:  # Only include high-confidence matches
-                new_hits.append((rec, doc_url, hits, confidence))
+            for rec in parse_master_idx(idx_lines):
+                if rec["accession"] and (rec["cik"], rec["accession"]) not in seen:
+                    futures.append(pool.submit(process_rec, rec))
+        except requests.RequestException as e:
+            # The index streams in while filings are submitted, so read errors surface here
+            for future in futures:
+                future.cancel()
+            print(f"[error] Failed to read master idx: {e}", file=sys.stderr)
+            sys.exit(2)
+
+        for future in as_completed(futures):
+            result = future.result()
+            if result:
+                rec, doc_url, hits, confidence = result
+                new_hits.append(result)
                 mark_seen(conn, rec["cik"], rec["accession"], confidence)
-
-        except Exception as e:
-            print(f"[warn] Error scanning {filing_index_url}: {e}", file=sys.stderr)
-            continue
+                seen.add((rec["cik"], rec["accession"]))
 
     if not new_hits:
         print("[info] No new high-confidence govt-equity hits today.")
@@ -370,7 +532,7 @@ def main():
         conf_label = "HIGH" if conf >= 0.7 else "MEDIUM"
         lines.append(f"• [{conf_label} {conf:.2f}] {rec['company']} ({rec['cik']}) · {rec['form']} · {rec['date']}")
         lines.append(f"  {url}")
-        for i, (pattern, snippet) in enumerate(hits[:2], 1):
+        for i, (pattern, snippet, _) in enumerate(hits[:2], 1):
             lines.append(f"  → {textwrap.shorten(snippet, width=280, placeholder='…')}")
         lines.append("")
     text_body = "\n".join(lines)
@@ -383,7 +545,7 @@ def main():
 
         snippets_html = "".join(
             f"<li style='margin:4px 0;'><code style='background:#f8f9fa;padding:2px 4px;'>{textwrap.shorten(snippet, width=300, placeholder='…')}</code></li>"
-            for pattern, snippet in hits[:2]
+            for pattern, snippet, _ in hits[:2]
         )
 
         html_rows.append(f"""
@@ -414,7 +576,8 @@ def main():
 
     try:
         msg = build_email(subject, html_body, text_body, from_email, to_email)
-        send_email(msg, smtp_host, smtp_port, smtp_user, smtp_pass)
+        with SMTPSession(smtp_host, smtp_port, smtp_user, smtp_pass) as smtp:
+            smtp.send(msg)
         print(f"[info] Emailed {len(new_hits)} hit(s) ({len(high_conf)} high-confidence) to {to_email}")
         sys.exit(0)
     except Exception as e:
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Filtering patterns shared by the government equity notifier and its test script.
+
+The raw pattern lists are kept for display; the *_RE tuples are the compiled
+forms the scanners use.
+"""
+
+import re
+
+# Government entities - more specific patterns
+GOVERNMENT_ENTITIES = [
+    r"\bU\.S\. Government\b",
+    r"\bUnited States Government\b",
+    r"\bDepartment of Commerce\b",
+    r"\bDepartment of Defense\b",
+    r"\bDOD\b",
+    r"\bDOC\b",
+    r"\bTreasury Department\b",
+    r"\bU\.S\. Treasury\b",
+    r"\bNational Security\b",
+    r"\bCHIPS and Science Act\b",
+    r"\bCHIPS Act\b",
+    r"\bDefense Production Act\b",
+    r"\bCommittee on Foreign Investment\b",
+    r"\bCFIUS\b"
+]
+
+# Investment/transaction terms - more precise
+INVESTMENT_TERMS = [
+    r"\bequity investment\b",
+    r"\bequity stake\b",
+    r"\bequity position\b",
+    r"\bpreferred shares\b",
+    r"\bpreferred stock investment\b",
+    r"\bstock purchase\b",
+    r"\bwarrant agreement\b",
+    r"\bwarrant issuance\b",
+    r"\bconvertible preferred\b",
+    r"\bseries [A-Z] preferred\b",
+    r"\binvestment agreement\b",
+    r"\bpurchase agreement\b",
+    r"\bfunding agreement\b",
+    r"\bcapital investment\b"
+]
+
+# Transaction indicators - signals of actual deals
+TRANSACTION_INDICATORS = [
+    r"\$[\d,]+\s*(million|billion)\s*(investment|funding|purchase)",
+    r"(received|obtained|secured)\s+\$[\d,]+",
+    r"(closing|completion)\s+of.*investment",
+    r"(entered into|executed|signed).*agreement",
+    r"(purchase|issuance)\s+of.*shares",
+    r"(funding|investment).*of\s+\$[\d,]+",
+    r"(total|aggregate)\s+(funding|investment)",
+    r"(first|initial|additional)\s+tranche"
+]
+
+# Common false positive contexts to exclude
+FALSE_POSITIVE_EXCLUSIONS = [
+    r"risk.*factors?",
+    r"material.*weakness",
+    r"legal.*proceedings?",
+    r"forward.*looking.*statements?",
+    r"hypothetical",
+    r"example",
+    r"illustration",
+    r"may.*be.*subject.*to",
+    r"could.*be.*impacted.*by",
+    r"potential.*future",
+    r"general.*economic.*conditions",
+    r"regulatory.*environment",
+    r"bond.*market",
+    r"debt.*securities",
+    r"credit.*facility"
+]
+
+# Compiled once at import; call .search/.finditer on these directly.
+# Patterns are lowercased and matched case-sensitively against text that has
+# already been lowercased once per filing (they contain no uppercase escapes).
+GOV_RE = tuple(re.compile(p.lower()) for p in GOVERNMENT_ENTITIES)
+INV_RE = tuple(re.compile(p.lower()) for p in INVESTMENT_TERMS)
+TXN_RE = tuple(re.compile(p.lower()) for p in TRANSACTION_INDICATORS)
+FP_RE = tuple(re.compile(p.lower()) for p in FALSE_POSITIVE_EXCLUSIONS)
+
+# Pre-filter covering every GOVERNMENT_ENTITIES pattern; filings matching none
+# of these skip the regex pass. Keywords are substrings of the lowercased text.
+# The bare acronyms are too short for a substring test ("doc" is in "document"),
+# so they get the same word-bounded match GOV_RE uses for \bDOD\b / \bDOC\b.
+PREFILTER_KEYWORDS = (
+    "government", "treasury", "department of", "national security",
+    "chips", "defense production", "foreign investment", "cfius",
+)
+PREFILTER_ACRONYM_RE = re.compile(r"\b(?:dod|doc)\b")
@@ -10,29 +10,10 @@ from urllib.parse import urljoin
 from typing import List, Dict, Tuple
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-# Same patterns as main script
-GOVERNMENT_ENTITIES = [
-    r"\bU\.S\. Government\b",
-    r"\bUnited States Government\b",
-    r"\bDepartment of Commerce\b",
-    r"\bDepartment of Defense\b",
-    r"\bDOD\b",
-    r"\bDOC\b",
-    r"\bCHIPS and Science Act\b",
-    r"\bCHIPS Act\b",
-]
-
-INVESTMENT_TERMS = [
-    r"\bequity investment\b",
-    r"\bequity stake\b",
-    r"\bpreferred stock investment\b",
-    r"\bstock purchase\b",
-    r"\bwarrant agreement\b",
-    r"\binvestment agreement\b",
-]
+from gov_equity_notifier_enhanced import parse_html
+from gov_patterns import GOV_RE
 
 PROXIMITY_CHARS = 150
 SNIPPET_CHARS = 120
@@ -97,13 +78,12 @@ def test_scan_filing(url, headers):
     """Simplified scanning for testing."""
     try:
         html = get_text(url, headers)
-        soup = BeautifulSoup(html, 'html.parser')
-        clean_text = soup.get_text()
+        text_lower = parse_html(html).text_content().lower()
 
         # Look for any government mentions
         gov_found = False
-        for pattern in GOVERNMENT_ENTITIES:
-            if re.search(pattern, clean_text, re.I):
+        for rx in GOV_RE:
+            if rx.search(text_lower):
                 gov_found = True
                 break
 
@@ -142,11 +122,12 @@ def main():
             filing_index_url = urljoin(base, rec["path"])
             try:
                 file_html = get_text(filing_index_url, headers)
-                soup = BeautifulSoup(file_html, "html.parser")
+                tree = parse_html(file_html)
 
-                doc_link = soup.find("a", href=True, string=re.compile(r"\.htm(l)?$", re.I))
-                doc_url = filing_index_url if not doc_link else urljoin(
-                    filing_index_url.rsplit("/", 1)[0] + "/", doc_link["href"]
+                doc_link = next((a for a in tree.xpath("//a[@href]")
+                                 if re.search(r"\.htm(l)?$", a.text_content(), re.I)), None)
+                doc_url = filing_index_url if doc_link is None else urljoin(
+                    filing_index_url.rsplit("/", 1)[0] + "/", doc_link.get("href")
                 )
 
                 has_match, reason = test_scan_filing(doc_url, headers)